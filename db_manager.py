@@ -16,6 +16,12 @@ class DatabaseManager:
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps the database consistent at NORMAL; only the last
+        # transaction can be lost on power failure
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        # ~20MB page cache (negative = KiB) keeps the statistics scans in memory
+        conn.execute("PRAGMA cache_size=-20000")
         conn.execute("PRAGMA foreign_keys = ON")
         try:
             yield conn
@@ -26,6 +32,15 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    @contextmanager
+    def connection(self, conn=None):
+        """Reuse a caller's open connection (sharing its transaction) or open one"""
+        if conn is not None:
+            yield conn
+            return
+        with self.get_connection() as own_conn:
+            yield own_conn
+
     def init_database(self):
         """Create tables if they don't exist"""
         with self.get_connection() as conn:
@@ -109,6 +124,14 @@ class DatabaseManager:
                 ON games(created_at)
             """)
 
+            # Partial index over rows that reference an image; covers the
+            # orphan cleanup and the website's image-copy listing
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_games_image_filename
+                ON games(image_filename)
+                WHERE image_filename IS NOT NULL AND image_filename != ''
+            """)
+
             # Promotions table - tracks each free game promotion period
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS promotions (
@@ -263,13 +286,16 @@ class DatabaseManager:
         'effective_date', 'viewable_date', 'expiry_date', 'tag_ids', 'categories',
     ]
 
-    def batch_insert_or_update_games(self, games_data):
-        """Batch insert or update multiple games. Returns {(epic_id, platform): game_id} dict."""
+    def batch_insert_or_update_games(self, games_data, conn=None):
+        """Batch insert or update multiple games. Returns {(epic_id, platform): game_id} dict.
+
+        Pass ``conn`` to run inside the caller's transaction instead of committing here.
+        """
         if not games_data:
             return {}
 
         game_id_map = {}
-        with self.get_connection() as conn:
+        with self.connection(conn) as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT id, epic_id, platform, original_price_cents FROM games")
             existing = {(row['epic_id'], row['platform']): (row['id'], row['original_price_cents'])
@@ -332,17 +358,18 @@ class DatabaseManager:
 
         return game_id_map
 
-    def batch_insert_promotions(self, promotions_data):
+    def batch_insert_promotions(self, promotions_data, conn=None):
         """
         Batch insert multiple promotions, avoids duplicates.
 
         Args:
             promotions_data: List of dicts with keys: game_id, start_date, end_date, status, platform
+            conn: Optional open connection; the caller then owns the commit
         """
         if not promotions_data:
             return
 
-        with self.get_connection() as conn:
+        with self.connection(conn) as conn:
             cursor = conn.cursor()
 
             for promo_data in promotions_data:
@@ -478,9 +505,10 @@ class DatabaseManager:
             cursor.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
 
-    def record_scrape_run(self, games_found, new_games, current, upcoming, success=True, error=None):
-        """Log scraper execution"""
-        with self.get_connection() as conn:
+    def record_scrape_run(self, games_found, new_games, current, upcoming, success=True, error=None,
+                          conn=None):
+        """Log scraper execution. Pass ``conn`` to join the caller's transaction."""
+        with self.connection(conn) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT INTO scrape_history
@@ -489,9 +517,9 @@ class DatabaseManager:
             """, (games_found, new_games, current, upcoming, int(success), error))
             print(f"Recorded scrape run: {games_found} games found, {new_games} new")
 
-    def update_statistics_cache(self):
-        """Recalculate and cache statistics"""
-        with self.get_connection() as conn:
+    def update_statistics_cache(self, conn=None):
+        """Recalculate and cache statistics. Pass ``conn`` to join the caller's transaction."""
+        with self.connection(conn) as conn:
             cursor = conn.cursor()
 
             # Calculate statistics
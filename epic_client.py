@@ -1,15 +1,21 @@
 """Epic Games Store API client: URL validation, data extraction, hashing."""
 
+import bisect
 import hashlib
 import ipaddress
 import json
 import os
-import re
 import socket
+import sys
 from datetime import datetime
 from functools import lru_cache
 from urllib.parse import urlparse
 
+try:
+    import orjson
+except ImportError:  # stdlib fallback keeps the client importable without it
+    orjson = None
+
 import epic_config
 
 # Common Epic Games Store tag ID -> genre name mapping
@@ -58,6 +64,7 @@ class Config:
     """Configuration constants for security and performance."""
     MAX_IMAGE_SIZE = 10 * 1024 * 1024
     MAX_IMAGE_DIMENSION = 10000
+    MAX_OUTPUT_DIMENSION = 1920
     ALLOWED_URL_SCHEMES = ['https']
     IMAGE_DOWNLOAD_TIMEOUT = 10
     API_REQUEST_TIMEOUT = 30
@@ -65,6 +72,8 @@ class Config:
     MAX_DOWNLOAD_WORKERS = 10
     IMAGE_QUALITY = 85
     IMAGE_OPTIMIZE = True
+    IMAGE_PROGRESSIVE = True
+    IMAGE_SUBSAMPLING = 2  # 4:2:0 chroma
     OUTPUT_DIR = 'output'
     IMAGES_DIR = 'output/images'
     API_HASH_FILE = 'output/.api_hash'
@@ -82,11 +91,43 @@ class Config:
     ]
 
 
+def _build_blocked_ranges(networks):
+    """Map IP version -> (sorted range starts, matching range ends) as ints."""
+    ranges = {4: [], 6: []}
+    for net in networks:
+        ranges[net.version].append((int(net.network_address), int(net.broadcast_address)))
+    by_version = {}
+    for version, spans in ranges.items():
+        merged = []
+        for lo, hi in sorted(spans):
+            if merged and lo <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], hi)
+            else:
+                merged.append([lo, hi])
+        by_version[version] = ([lo for lo, _ in merged], [hi for _, hi in merged])
+    return by_version
+
+
+_BLOCKED_RANGES = _build_blocked_ranges(Config.BLOCKED_IP_RANGES)
+
+
+def _is_blocked_ip(ip_obj):
+    """Binary-search the frozen BLOCKED_IP_RANGES for ip_obj."""
+    starts, ends = _BLOCKED_RANGES[ip_obj.version]
+    ip_int = int(ip_obj)
+    i = bisect.bisect_right(starts, ip_int) - 1
+    return i >= 0 and ip_int <= ends[i]
+
+
+# Path separators, drive colon and control characters (including NUL) -> '_'
+_UNSAFE_FILENAME_TABLE = str.maketrans(dict.fromkeys('/\\:' + ''.join(map(chr, range(32))), '_'))
+
+
 def sanitize_filename(filename):
     """Sanitize filename to prevent path traversal attacks."""
     if not filename:
         return 'unknown'
-    filename = re.sub(r'[/\\:\0\x00-\x1f]', '_', str(filename))
+    filename = str(filename).translate(_UNSAFE_FILENAME_TABLE)
     filename = filename.lstrip('. ')
     filename = filename[:200]
     if not filename or filename == '_':
@@ -94,6 +135,53 @@ def sanitize_filename(filename):
     return filename
 
 
+@lru_cache(maxsize=256)
+def _resolve_host(hostname):
+    """Resolve hostname to its unique IP strings. Cached; failures are not cached."""
+    infos = socket.getaddrinfo(hostname, None, type=socket.SOCK_STREAM)
+    return tuple(dict.fromkeys(info[4][0] for info in infos))
+
+
+def prewarm_dns(urls):
+    """Resolve each distinct hostname in urls once so download workers hit the cache."""
+    hostnames = set()
+    for url in urls:
+        try:
+            hostname = urlparse(url).hostname
+        except ValueError:
+            continue
+        if hostname:
+            hostnames.add(hostname)
+    for hostname in hostnames:
+        try:
+            _resolve_host(hostname)
+        except (socket.gaierror, UnicodeError):
+            pass
+
+
+@lru_cache(maxsize=256)
+def _validate_host(hostname):
+    """Resolve hostname and reject it if any address is private/internal.
+
+    Cached per hostname since every image on the same CDN shares the result.
+    DNS failures raise socket.gaierror and are therefore not cached.
+    """
+    ip_strs = _resolve_host(hostname)
+    if not ip_strs:
+        print(f"No addresses returned for hostname {hostname}")
+        return False
+    for ip_str in ip_strs:
+        try:
+            ip_obj = ipaddress.ip_address(ip_str)
+        except ValueError:
+            print(f"Invalid IP from DNS: {ip_str!r}")
+            return False
+        if _is_blocked_ip(ip_obj):
+            print(f"Blocked access to private/internal IP: {ip_str} ({hostname})")
+            return False
+    return True
+
+
 def validate_url(url):
     """Validate URL to prevent SSRF attacks. Returns True if URL is safe."""
     if not url:
@@ -107,29 +195,10 @@ def validate_url(url):
             print("Blocked URL without hostname")
             return False
         try:
-            infos = socket.getaddrinfo(parsed.hostname, None, type=socket.SOCK_STREAM)
+            return _validate_host(parsed.hostname)
         except socket.gaierror as e:
             print(f"Failed to resolve hostname {parsed.hostname}: {e}")
             return False
-        if not infos:
-            print(f"No addresses returned for hostname {parsed.hostname}")
-            return False
-        seen = set()
-        for info in infos:
-            ip_str = info[4][0]
-            if ip_str in seen:
-                continue
-            seen.add(ip_str)
-            try:
-                ip_obj = ipaddress.ip_address(ip_str)
-            except ValueError:
-                print(f"Invalid IP from DNS: {ip_str!r}")
-                return False
-            for blocked_range in Config.BLOCKED_IP_RANGES:
-                if ip_obj in blocked_range:
-                    print(f"Blocked access to private/internal IP: {ip_str} ({parsed.hostname})")
-                    return False
-        return True
     except Exception as e:
         print(f"URL validation error: {e}")
         return False
@@ -197,13 +266,20 @@ def extract_game_metadata(game):
     }
 
 
+_IMAGE_TYPE_PRIORITY = ('OfferImageWide', 'OfferImageTall', 'Thumbnail', 'featuredMedia')
+
+
 def get_game_image_url(game):
     """Get the best image URL for a game."""
     key_images = game.get('keyImages', [])
-    for image_type in ['OfferImageWide', 'OfferImageTall', 'Thumbnail', 'featuredMedia']:
-        for image in key_images:
-            if image.get('type') == image_type:
-                return image.get('url')
+    # One pass; the first image listed for each type wins, as before
+    by_type = {}
+    for image in key_images:
+        by_type.setdefault(image.get('type'), image)
+    for image_type in _IMAGE_TYPE_PRIORITY:
+        image = by_type.get(image_type)
+        if image is not None:
+            return image.get('url')
     if key_images:
         return key_images[0].get('url')
     return None
@@ -221,12 +297,14 @@ def get_game_price(game):
 
 def epic_free_discount_percentage(offer):
     """Return discountPercentage as int, or None if missing/malformed."""
-    if not isinstance(offer, dict):
-        return None
-    ds = offer.get('discountSetting')
-    if not isinstance(ds, dict):
+    # Called for every offer in the scrape loops: one direct lookup chain,
+    # with non-dict offers/settings surfacing as TypeError
+    try:
+        pct = offer['discountSetting']['discountPercentage']
+    except (KeyError, TypeError):
         return None
-    pct = ds.get('discountPercentage')
+    if type(pct) is int:
+        return pct
     if pct is None:
         return None
     try:
@@ -235,6 +313,22 @@ def epic_free_discount_percentage(offer):
         return None
 
 
+if sys.version_info >= (3, 11):
+    # fromisoformat accepts the 'Z' suffix natively from 3.11 on
+    _fromisoformat_utc = datetime.fromisoformat
+else:
+    def _fromisoformat_utc(iso_date):
+        if iso_date.endswith('Z'):
+            iso_date = iso_date[:-1] + '+00:00'
+        return datetime.fromisoformat(iso_date)
+
+
+@lru_cache(maxsize=512)
+def _iso_to_dt(iso_date):
+    """Parse an Epic ISO-8601 timestamp ('Z' suffix allowed). Shared, cached."""
+    return _fromisoformat_utc(iso_date)
+
+
 def parse_offer_iso_dates(offer, game_title='?'):
     """Return (start, end) as timezone-aware datetimes, or (None, None) if invalid."""
     if not isinstance(offer, dict):
@@ -244,28 +338,51 @@ def parse_offer_iso_dates(offer, game_title='?'):
     if not start_raw or not end_raw:
         return None, None
     try:
-        start = datetime.fromisoformat(str(start_raw).replace('Z', '+00:00'))
-        end = datetime.fromisoformat(str(end_raw).replace('Z', '+00:00'))
+        start = _iso_to_dt(str(start_raw))
+        end = _iso_to_dt(str(end_raw))
         return start, end
     except (ValueError, TypeError) as e:
         print(f"Skipping offer with bad dates for {game_title!r}: {e}")
         return None, None
 
 
-@lru_cache(maxsize=128)
+# Unbounded: a run only ever sees a couple of distinct dates per game
+_date_cache = {}
+_DISPLAY_DATE_FORMAT = '%b %d at %I:%M %p'
+
+
 def format_date(iso_date):
     """Format ISO date to human-readable format. Cached for performance."""
+    if not iso_date:
+        return ''
+    hit = _date_cache.get(iso_date)
+    if hit is not None:
+        return hit
     try:
-        dt = datetime.fromisoformat(iso_date.replace('Z', '+00:00'))
-        return dt.strftime('%b %d at %I:%M %p')
+        dt = _iso_to_dt(iso_date)
+        formatted = dt.strftime(_DISPLAY_DATE_FORMAT)
     except (ValueError, AttributeError, TypeError) as e:
         print(f"Date formatting failed for '{iso_date}': {e}")
-        return str(iso_date)
+        formatted = str(iso_date)
+    _date_cache[iso_date] = formatted
+    return formatted
 
 
-def compute_api_hash(response_data):
-    """Compute SHA256 hash of API response for change detection."""
-    return hashlib.sha256(json.dumps(response_data, sort_keys=True).encode()).hexdigest()
+def loads_json(raw_body):
+    """Parse a JSON document from bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(raw_body)
+    return json.loads(raw_body)
+
+
+def compute_api_hash(raw_body):
+    """Compute SHA256 hash of the raw API response body for change detection.
+
+    Hashing the bytes as received avoids re-serialising the parsed payload.
+    Not a security boundary, so ``usedforsecurity=False`` lets OpenSSL use its
+    fastest (SHA-NI) implementation even on FIPS-restricted builds.
+    """
+    return hashlib.sha256(raw_body, usedforsecurity=False).hexdigest()
 
 
 def load_previous_api_hash():
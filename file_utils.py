@@ -0,0 +1,41 @@
+"""Shared output helpers: JSON serialisation and atomic file writes."""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback keeps the module importable without it
+    orjson = None
+
+
+def dumps_json(obj):
+    """Serialise obj to 2-space-indented UTF-8 JSON bytes, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def write_bytes_atomic(path, data):
+    """Write data to path via a sibling temp file and os.replace.
+
+    Readers (and the image cache check) never see a truncated file under the
+    final name if the run is interrupted mid-write.
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        # Unbuffered fd write: callers already hold one contiguous buffer
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -13,6 +13,7 @@ import sys
 from datetime import datetime, timezone
 from db_manager import DatabaseManager
 from epic_client import resolve_tag_names
+from file_utils import dumps_json, write_bytes_atomic
 
 
 def slugify(text):
@@ -33,6 +34,15 @@ def ensure_directory(path):
     """Create directory if it doesn't exist"""
     os.makedirs(path, exist_ok=True)
 
+def _scan_file_stats(directory):
+    """Map filename -> stat_result for regular files directly under directory."""
+    stats = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_file():
+                stats[entry.name] = entry.stat()
+    return stats
+
 def copy_images(db):
     """
     Incrementally sync game images to website directory.
@@ -57,49 +67,38 @@ def copy_images(db):
         )
         needed_images = {row[0] for row in cursor.fetchall()}
 
-    dest_files = set(os.listdir(dest)) if os.path.exists(dest) else set()
+    # One scandir pass per side; DirEntry.stat() is cached, so no per-file
+    # exists/getmtime/getsize calls below
+    source_stats = _scan_file_stats(source)
+    dest_stats = _scan_file_stats(dest)
     copied = 0
     skipped = 0
     removed = 0
 
+    # Copy new or modified images (only those referenced in DB)
     missing_sources = []
     for filename in sorted(needed_images):
-        lower = filename.lower()
-        if not lower.endswith(_IMAGE_EXTENSIONS):
-            continue
-        source_path = os.path.join(source, filename)
-        if not os.path.exists(source_path):
-            missing_sources.append(filename)
-
-    # Copy new or modified images (only those referenced in DB)
-    for filename in needed_images:
         if not filename.lower().endswith(_IMAGE_EXTENSIONS):
             continue
-        source_path = os.path.join(source, filename)
-        if not os.path.exists(source_path):
+        source_stat = source_stats.get(filename)
+        if source_stat is None:
+            missing_sources.append(filename)
             continue
-        dest_path = os.path.join(dest, filename)
 
         # Check if file needs copying (new or modified)
-        needs_copy = True
-        if os.path.exists(dest_path):
-            source_mtime = os.path.getmtime(source_path)
-            dest_mtime = os.path.getmtime(dest_path)
-            source_size = os.path.getsize(source_path)
-            dest_size = os.path.getsize(dest_path)
-            if source_size == dest_size and dest_mtime >= source_mtime:
-                needs_copy = False
-                skipped += 1
-
-        if needs_copy:
-            shutil.copy2(source_path, dest_path)
-            copied += 1
+        dest_stat = dest_stats.get(filename)
+        if (dest_stat is not None
+                and source_stat.st_size == dest_stat.st_size
+                and dest_stat.st_mtime >= source_stat.st_mtime):
+            skipped += 1
+            continue
+        shutil.copy2(os.path.join(source, filename), os.path.join(dest, filename))
+        copied += 1
 
     # Remove images from dest that are no longer needed
-    for filename in dest_files:
+    for filename in dest_stats:
         if filename.lower().endswith(_IMAGE_EXTENSIONS) and filename not in needed_images:
-            dest_path = os.path.join(dest, filename)
-            os.remove(dest_path)
+            os.remove(os.path.join(dest, filename))
             removed += 1
 
     print(f"Images sync: {copied} copied, {skipped} skipped, {removed} removed ({len(needed_images)} total)")
@@ -258,15 +257,7 @@ def export_data_json(db):
     # Save main data file (atomic write: temp file then rename)
     data_file = 'website/data/games.json'
     ensure_directory('website/data')
-    tmp = data_file + '.tmp'
-    try:
-        with open(tmp, 'w', encoding='utf-8') as f:
-            json.dump(data_export, f, indent=2, ensure_ascii=False)
-        os.replace(tmp, data_file)
-    except OSError:
-        if os.path.exists(tmp):
-            os.remove(tmp)
-        raise
+    write_bytes_atomic(data_file, dumps_json(data_export))
 
     print(f"Exported {len(all_games_pc)} PC games to {data_file}")
     return data_export
@@ -818,8 +809,7 @@ def generate_api_latest(data):
                       for g in data.get('upcomingGames', [])[:5]],
     }
     ensure_directory('website/api')
-    with open('website/api/latest.json', 'w', encoding='utf-8') as f:
-        json.dump(latest, f, indent=2, ensure_ascii=False)
+    write_bytes_atomic('website/api/latest.json', dumps_json(latest))
     print(f"Generated website/api/latest.json ({len(current)} current, {len(data.get('upcomingGames', []))} upcoming)")
 
 
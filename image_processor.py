@@ -2,127 +2,319 @@
 
 import hashlib
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from io import BytesIO
 
 import requests
 from PIL import Image
 
-from epic_client import Config, validate_url
+from epic_client import Config, prewarm_dns, validate_url
+from file_utils import write_bytes_atomic
 
-# MD5 hashes of known placeholder/generic images that should be rejected
+# MD5 hashes of known placeholder/generic images that should be rejected,
+# mapped to the placeholder's source (width, height), or None when the size
+# was not recorded
 KNOWN_PLACEHOLDER_MD5S = {
     # Epic Games Store generic "EGS" blue-gradient placeholder
-    '12e669fb945b4b7dbcacf77f7d131214',
+    '12e669fb945b4b7dbcacf77f7d131214': None,
 }
 
+# The save the hashes above were taken from: the original quality-85 output.
+# 4:2:0 subsampling is Pillow's default at this quality.
+_PLACEHOLDER_FINGERPRINT_SAVE_KWARGS = {'quality': 85, 'optimize': True}
 
-def _md5_of_file(file_path):
-    """Compute MD5 hash of a file. Returns None if file cannot be read."""
+
+def _read_file(file_path):
+    """Read a whole file. Returns None if file cannot be read."""
     try:
         with open(file_path, 'rb') as f:
-            return hashlib.md5(f.read()).hexdigest()
+            return f.read()
     except OSError:
         return None
 
 
-def _is_placeholder_image(file_path):
-    """Check if a file is a known placeholder image by its MD5 hash."""
-    md5 = _md5_of_file(file_path)
-    return md5 is not None and md5 in KNOWN_PLACEHOLDER_MD5S
+def _is_placeholder_bytes(data):
+    """Check if file contents are a known placeholder image by their MD5 hash."""
+    return hashlib.md5(data, usedforsecurity=False).hexdigest() in KNOWN_PLACEHOLDER_MD5S
+
+
+def _could_be_placeholder(size):
+    """True if an image of this (width, height) may match a known placeholder."""
+    sizes = KNOWN_PLACEHOLDER_MD5S.values()
+    return None in sizes or size in sizes
+
 
+def _is_placeholder_rgb(img):
+    """Check a flattened, full-size RGB image against the known placeholders.
 
-def is_valid_cached_image(file_path):
-    """Check if a cached image file exists and is valid."""
-    if not os.path.exists(file_path):
+    The image is fingerprinted with the fixed settings the hashes were taken
+    under, so the check does not depend on Config's encoder settings. Images
+    whose size rules out every known placeholder are not encoded at all.
+    """
+    if not _could_be_placeholder(img.size):
         return False
-    if _is_placeholder_image(file_path):
+    buf = BytesIO()
+    img.save(buf, 'JPEG', **_PLACEHOLDER_FINGERPRINT_SAVE_KWARGS)
+    return _is_placeholder_bytes(buf.getvalue())
+
+
+# SOFn markers carry frame dimensions; C4 (DHT), C8 (JPG) and CC (DAC) do not
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _jpeg_dimensions(data):
+    """Parse (width, height) from a JPEG header buffer by walking its markers.
+
+    Returns None when the buffer is not a JPEG or the SOF segment is not
+    within the supplied bytes.
+    """
+    if data[:3] != b'\xff\xd8\xff':
+        return None
+    pos = 2
+    size = len(data)
+    while pos + 4 <= size:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            pos += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            return None
+        if marker in _JPEG_SOF_MARKERS:
+            if pos + 9 > size:
+                return None
+            height = int.from_bytes(data[pos + 5:pos + 7], 'big')
+            width = int.from_bytes(data[pos + 7:pos + 9], 'big')
+            return width, height
+        pos += 2 + int.from_bytes(data[pos + 2:pos + 4], 'big')
+    return None
+
+
+def _file_exists_nonempty(file_path):
+    """True if file_path exists and is non-empty (a single stat call)."""
+    try:
+        return os.stat(file_path).st_size > 0
+    except OSError:
         return False
+
+
+def scan_image_cache(images_dir=None):
+    """Map filename -> size for regular files in the images dir (one scandir pass)."""
+    sizes = {}
     try:
-        file_size = os.path.getsize(file_path)
-        if file_size < 1024:
+        with os.scandir(images_dir or Config.IMAGES_DIR) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        sizes[entry.name] = entry.stat().st_size
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return sizes
+
+
+def is_valid_cached_image(file_path, cached_sizes=None):
+    """Check if a cached image file exists and is valid.
+
+    cached_sizes, from scan_image_cache, replaces the per-file stat for paths
+    inside the images dir. The file is read once; the same buffer feeds the
+    placeholder MD5 and the JPEG header walk, and Pillow only sees it if the
+    header can't be parsed.
+    """
+    if cached_sizes is not None:
+        size = cached_sizes.get(os.path.basename(file_path))
+        if size is None or size < 1024:
             return False
-        with Image.open(file_path) as img:
-            if img.format not in ('JPEG', 'JPG'):
-                return False
-            if img.width < 50 or img.height < 50:
+    else:
+        try:
+            if os.stat(file_path).st_size < 1024:
                 return False
-            return True
-    except (OSError, IOError, Image.UnidentifiedImageError):
+        except OSError:
+            return False
+    data = _read_file(file_path)
+    if data is None or _is_placeholder_bytes(data):
         return False
+    dims = _jpeg_dimensions(data)
+    if dims is None:
+        try:
+            with Image.open(BytesIO(data)) as img:
+                if img.format not in ('JPEG', 'JPG'):
+                    return False
+                dims = img.size
+        except (OSError, IOError, Image.UnidentifiedImageError):
+            return False
+    return all(50 <= d <= Config.MAX_IMAGE_DIMENSION for d in dims)
 
 
-def download_and_convert_image(image_url, output_path, session=None):
-    """Download an image and convert to optimized JPG."""
-    if is_valid_cached_image(output_path):
-        return True
+def make_cached_image_check(images_dir=None):
+    """Return an is_valid_cached_image for one scrape run over a single dir scan.
+
+    Verdicts are memoized per path, so a game checked by the offer loop, the
+    retry pass and the DB reconciliation is validated once. Build a new
+    checker per run; it does not see files written after the scan.
+    """
+    cached_sizes = scan_image_cache(images_dir)
+
+    @lru_cache(maxsize=None)
+    def check(file_path):
+        return is_valid_cached_image(file_path, cached_sizes)
+
+    return check
+
+
+def _encode_jpeg(img):
+    """Encode img to JPEG bytes using the configured quality/progressive/subsampling.
+
+    Pillow can fail with optimize=True on very large images when the encoder
+    buffer is too small; retry once without the Huffman optimisation pass.
+    """
+    save_kwargs = {
+        'quality': Config.IMAGE_QUALITY,
+        'optimize': Config.IMAGE_OPTIMIZE,
+        'progressive': Config.IMAGE_PROGRESSIVE,
+        'subsampling': Config.IMAGE_SUBSAMPLING,
+    }
+    buf = BytesIO()
+    try:
+        img.save(buf, 'JPEG', **save_kwargs)
+    except OSError:
+        if not save_kwargs['optimize']:
+            raise
+        buf = BytesIO()
+        img.save(buf, 'JPEG', **{**save_kwargs, 'optimize': False})
+    return buf.getvalue()
+
+
+def _read_capped_body(response, size_hint=0):
+    """Read a streamed response body, enforcing Config.MAX_IMAGE_SIZE.
+
+    Chunks are copied into one bytearray pre-sized from Content-Length, so the
+    common case fills a single buffer with no reallocation. The buffer grows
+    geometrically, capped just past MAX_IMAGE_SIZE, if the body turns out
+    larger than the hint.
+    """
+    buf = bytearray(size_hint)
+    view = memoryview(buf)
+    filled = 0
+    try:
+        for chunk in response.iter_content(chunk_size=Config.DOWNLOAD_CHUNK_SIZE):
+            if not chunk:
+                continue
+            end = filled + len(chunk)
+            if end > Config.MAX_IMAGE_SIZE:
+                raise ValueError(f"Download exceeded {Config.MAX_IMAGE_SIZE} bytes")
+            if end > len(buf):
+                view.release()
+                # Never grow past the cap; anything larger is rejected above
+                new_size = min(max(end, 2 * len(buf)), Config.MAX_IMAGE_SIZE + 1)
+                buf.extend(bytes(new_size - len(buf)))
+                view = memoryview(buf)
+            view[filled:end] = chunk
+            filled = end
+        return view[:filled].tobytes()
+    finally:
+        view.release()
+
+
+def _fetch_image_bytes(image_url, session):
+    """Download an image body over the shared session with SSRF and size checks."""
     if not validate_url(image_url):
         raise ValueError(f"Invalid or unsafe URL: {image_url}")
+    with session.get(
+        image_url,
+        timeout=Config.IMAGE_DOWNLOAD_TIMEOUT,
+        stream=True,
+        allow_redirects=True,
+    ) as img_response:
+        img_response.raise_for_status()
+        final_url = img_response.url
+        if not validate_url(final_url):
+            raise ValueError(f"Redirect led to unsafe URL: {final_url}")
+
+        content_length = img_response.headers.get('Content-Length')
+        if content_length and int(content_length) > Config.MAX_IMAGE_SIZE:
+            raise ValueError(
+                f"Image too large: {content_length} bytes (max {Config.MAX_IMAGE_SIZE})"
+            )
+
+        size_hint = int(content_length) if content_length else 0
+        return _read_capped_body(img_response, size_hint)
+
+
+def _flatten_to_rgb(img):
+    """Return img as RGB, compositing any transparency onto white."""
+    if img.mode in ('RGBA', 'LA', 'P'):
+        # One RGBA path for all three; LA previously lost its alpha here
+        if img.mode != 'RGBA':
+            img = img.convert('RGBA')
+        if img.getchannel('A').getextrema()[0] == 255:
+            # Fully opaque (typical for OfferImageWide): no blend needed
+            return img.convert('RGB')
+        background = Image.new('RGBA', img.size, (255, 255, 255, 255))
+        return Image.alpha_composite(background, img).convert('RGB')
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def _convert_and_save_image(raw_bytes, output_path):
+    """Decode downloaded bytes, flatten to RGB and write the JPG (plus WebP) output."""
+    img = Image.open(BytesIO(raw_bytes))
+
+    if img.width > Config.MAX_IMAGE_DIMENSION or img.height > Config.MAX_IMAGE_DIMENSION:
+        raise ValueError(
+            f"Image dimensions too large: {img.width}x{img.height} "
+            f"(max {Config.MAX_IMAGE_DIMENSION})"
+        )
+
+    # Image.open only parsed the header so far. Placeholder hashes need the
+    # full-size pixels, so flatten and check up front only when this size
+    # could be a placeholder.
+    if _could_be_placeholder(img.size):
+        img = _flatten_to_rgb(img)
+        if _is_placeholder_rgb(img):
+            raise ValueError("Downloaded image is a known placeholder — rejecting")
+    elif img.mode == 'P':
+        # Palette images only resize with NEAREST; expand before scaling
+        img = img.convert('RGBA')
+
+    # Downscale before flattening so the alpha composite and the encoder work
+    # on the output-sized buffer. thumbnail() drafts a still-unloaded JPEG, so
+    # libjpeg decodes at 1/2, 1/4 or 1/8 scale while staying at least
+    # reducing_gap (2x) above the output size.
+    if max(img.size) > Config.MAX_OUTPUT_DIMENSION:
+        img.thumbnail(
+            (Config.MAX_OUTPUT_DIMENSION, Config.MAX_OUTPUT_DIMENSION),
+            Image.Resampling.LANCZOS,
+        )
+    img = _flatten_to_rgb(img)
 
-    http_client = session if session else requests
+    write_bytes_atomic(output_path, _encode_jpeg(img))
 
+    # Also save WebP version for modern browsers (30% smaller)
+    webp_path = output_path.rsplit('.', 1)[0] + '.webp'
     try:
-        with http_client.get(
-            image_url,
-            timeout=Config.IMAGE_DOWNLOAD_TIMEOUT,
-            stream=True,
-            allow_redirects=True,
-        ) as img_response:
-            img_response.raise_for_status()
-            final_url = img_response.url
-            if not validate_url(final_url):
-                raise ValueError(f"Redirect led to unsafe URL: {final_url}")
-
-            content_length = img_response.headers.get('Content-Length')
-            if content_length and int(content_length) > Config.MAX_IMAGE_SIZE:
-                raise ValueError(
-                    f"Image too large: {content_length} bytes (max {Config.MAX_IMAGE_SIZE})"
-                )
-
-            content = BytesIO()
-            downloaded_bytes = 0
-            for chunk in img_response.iter_content(chunk_size=Config.DOWNLOAD_CHUNK_SIZE):
-                if chunk:
-                    downloaded_bytes += len(chunk)
-                    if downloaded_bytes > Config.MAX_IMAGE_SIZE:
-                        raise ValueError(f"Download exceeded {Config.MAX_IMAGE_SIZE} bytes")
-                    content.write(chunk)
-
-            content.seek(0)
-            img = Image.open(content)
-
-            if img.width > Config.MAX_IMAGE_DIMENSION or img.height > Config.MAX_IMAGE_DIMENSION:
-                raise ValueError(
-                    f"Image dimensions too large: {img.width}x{img.height} "
-                    f"(max {Config.MAX_IMAGE_DIMENSION})"
-                )
-
-            if img.mode in ('RGBA', 'LA', 'P'):
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                if img.mode == 'RGBA':
-                    background.paste(img, mask=img.split()[-1])
-                else:
-                    background.paste(img)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-
-            img.save(output_path, 'JPEG', quality=Config.IMAGE_QUALITY, optimize=Config.IMAGE_OPTIMIZE)
-
-            if _is_placeholder_image(output_path):
-                os.remove(output_path)
-                raise ValueError("Downloaded image is a known placeholder — rejecting")
-
-            # Also save WebP version for modern browsers (30% smaller)
-            webp_path = output_path.rsplit('.', 1)[0] + '.webp'
-            try:
-                img.save(webp_path, 'WEBP', quality=Config.IMAGE_QUALITY, method=6)
-            except Exception:
-                pass  # WebP optional, JPEG is the fallback
-        return True
+        webp_buf = BytesIO()
+        img.save(webp_buf, 'WEBP', quality=Config.IMAGE_QUALITY, method=6)
+        write_bytes_atomic(webp_path, webp_buf.getvalue())
+    except Exception:
+        pass  # WebP optional, JPEG is the fallback
+
 
+def download_and_convert_image(image_url, output_path, session):
+    """Download an image and convert to optimized JPG using the shared session."""
+    if is_valid_cached_image(output_path):
+        return True
+    try:
+        raw_bytes = _fetch_image_bytes(image_url, session)
+        _convert_and_save_image(raw_bytes, output_path)
+        return True
     except requests.exceptions.RequestException as e:
         raise RuntimeError(f"Failed to download image from {image_url}: {e}") from e
     except (OSError, IOError) as e:
@@ -135,7 +327,7 @@ def download_image_task(image_url, image_path, game_title, session, retries=2):
     for attempt in range(retries + 1):
         try:
             download_and_convert_image(image_url, image_path, session=session)
-            if os.path.exists(image_path) and os.path.getsize(image_path) > 0:
+            if _file_exists_nonempty(image_path):
                 return {'success': True, 'game': game_title, 'path': image_path}
             last_error = f"File was not created: {image_path}"
         except Exception as e:
@@ -146,6 +338,16 @@ def download_image_task(image_url, image_path, game_title, session, retries=2):
     return {'success': False, 'game': game_title, 'error': last_error, 'path': image_path}
 
 
+def _copy_image_outputs(source_path, image_path):
+    """Copy an already converted JPG (and its WebP, if any) to another image path."""
+    with open(source_path, 'rb') as f:
+        write_bytes_atomic(image_path, f.read())
+    source_webp = source_path.rsplit('.', 1)[0] + '.webp'
+    if os.path.exists(source_webp):
+        with open(source_webp, 'rb') as f:
+            write_bytes_atomic(image_path.rsplit('.', 1)[0] + '.webp', f.read())
+
+
 def _download_task_display_name(task):
     """Human-readable name for an image download task."""
     name = (
@@ -166,26 +368,49 @@ def run_parallel_image_downloads(download_tasks, session):
     failed_downloads = []
     if not download_tasks:
         return successful_downloads, failed_downloads
-    print(f"Downloading {len(download_tasks)} images in parallel...")
-    with ThreadPoolExecutor(max_workers=Config.MAX_DOWNLOAD_WORKERS) as executor:
-        future_to_task = {
-            executor.submit(
-                download_image_task,
-                task['url'],
-                task['path'],
-                _download_task_display_name(task),
-                session,
-            ): task
-            for task in download_tasks
-        }
-        for future in as_completed(future_to_task):
-            result = future.result()
+    # One fetch per distinct URL; other paths sharing it get a copy afterwards.
+    # This also keeps two workers from writing the same path when a game is
+    # queued as both a retry and a mystery update.
+    unique_tasks = {}
+    shared_tasks = []
+    for task in download_tasks:
+        primary = unique_tasks.setdefault(task['url'], task)
+        if primary is not task:
+            shared_tasks.append((task, primary['path']))
+    print(f"Downloading {len(unique_tasks)} images in parallel...")
+    prewarm_dns(unique_tasks.keys())
+    workers = min(Config.MAX_DOWNLOAD_WORKERS, len(unique_tasks))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            lambda task: download_image_task(
+                task['url'], task['path'], _download_task_display_name(task), session
+            ),
+            unique_tasks.values(),
+        )
+        for result in results:
             if result['success']:
                 print(f"Downloaded: {result['game']}")
                 successful_downloads.add(result['path'])
             else:
                 print(f"Failed: {result['game']} - {result['error']}")
                 failed_downloads.append(result)
+    for task, source_path in shared_tasks:
+        game_title = _download_task_display_name(task)
+        image_path = task['path']
+        if source_path not in successful_downloads:
+            error = f"Shared image download failed: {task['url']}"
+        else:
+            try:
+                if image_path != source_path:
+                    _copy_image_outputs(source_path, image_path)
+                successful_downloads.add(image_path)
+                continue
+            except OSError as e:
+                error = f"Failed to copy shared image to {image_path}: {e}"
+        print(f"Failed: {game_title} - {error}")
+        failed_downloads.append(
+            {'success': False, 'game': game_title, 'error': error, 'path': image_path}
+        )
     if failed_downloads:
         print(
             f"\n"
@@ -195,64 +420,77 @@ def run_parallel_image_downloads(download_tasks, session):
     return successful_downloads, failed_downloads
 
 
-def apply_successful_image_updates_to_db(db, successful_downloads, mystery_updates):
-    """Persist image (and optional mystery reveal name) after successful downloads."""
+def apply_successful_image_updates_to_db(db, successful_downloads, mystery_updates, conn=None):
+    """Persist image (and optional mystery reveal name) after successful downloads.
+
+    Expects only retry/mystery downloads: every path given overwrites the row's
+    image_filename. Pass ``conn`` to join the caller's transaction.
+    """
     if not successful_downloads:
         return
     print("Updating existing games with successfully downloaded images...")
-    with db.get_connection() as conn:
+    mystery_rows = []
+    plain_rows = []
+    for image_path in successful_downloads:
+        # Task paths are always <IMAGES_DIR>/<epic_id>.jpg
+        image_filename = image_path.rpartition(os.sep)[2]
+        epic_id = image_filename[:-4]
+        mystery_info = mystery_updates.get(epic_id)
+        if mystery_info and mystery_info.get('update_name'):
+            mystery_rows.append((mystery_info, image_filename, epic_id))
+        else:
+            plain_rows.append((image_filename, epic_id))
+    with db.connection(conn) as conn:
         cursor = conn.cursor()
         updated_count = 0
         mystery_revealed_count = 0
-        for image_path in successful_downloads:
-            image_filename = os.path.basename(image_path)
-            epic_id = os.path.splitext(image_filename)[0]
-            mystery_info = mystery_updates.get(epic_id)
-            if mystery_info and mystery_info.get('update_name'):
-                cursor.execute("""
-                    UPDATE games
-                    SET name = ?, image_filename = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE epic_id = ? AND platform = 'PC'
-                """, (mystery_info['new_name'], image_filename, epic_id))
-                if cursor.rowcount > 0:
-                    mystery_revealed_count += 1
-                    print(f"  Revealed: {mystery_info['old_name']} -> {mystery_info['new_name']}")
-            else:
-                cursor.execute("""
-                    UPDATE games
-                    SET image_filename = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE epic_id = ? AND platform = 'PC'
-                    AND (image_filename IS NULL OR image_filename = '')
-                """, (image_filename, epic_id))
-                if cursor.rowcount > 0:
-                    updated_count += 1
-            if mystery_info and not mystery_info.get('update_name'):
-                cursor.execute("""
-                    UPDATE games
-                    SET image_filename = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE epic_id = ? AND platform = 'PC'
-                """, (image_filename, epic_id))
-        conn.commit()
+        # Reveals are rare and each reports its own rename, so they run one
+        # statement apiece; the plain image updates below are batched
+        for mystery_info, image_filename, epic_id in mystery_rows:
+            cursor.execute("""
+                UPDATE games
+                SET name = ?, image_filename = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE epic_id = ? AND platform = 'PC'
+            """, (mystery_info['new_name'], image_filename, epic_id))
+            if cursor.rowcount > 0:
+                mystery_revealed_count += 1
+                print(f"  Revealed: {mystery_info['old_name']} -> {mystery_info['new_name']}")
+        if plain_rows:
+            cursor.executemany("""
+                UPDATE games
+                SET image_filename = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE epic_id = ? AND platform = 'PC'
+            """, plain_rows)
+            updated_count = max(cursor.rowcount, 0)
         if updated_count > 0:
             print(f"Updated image_filename for {updated_count} existing games")
         if mystery_revealed_count > 0:
             print(f"Revealed and updated {mystery_revealed_count} mystery games")
 
 
-def clear_orphaned_game_image_filenames(db):
-    """Clear DB image_filename when the file is missing or fails validation."""
-    with db.get_connection() as conn:
+def clear_orphaned_game_image_filenames(db, conn=None):
+    """Clear DB image_filename when the file is missing or fails validation.
+
+    Pass ``conn`` to join the caller's transaction. The images dir is
+    scanned once here, so rows whose file is gone are rejected without a
+    stat each.
+    """
+    cached_sizes = scan_image_cache()
+    with db.connection(conn) as conn:
         cursor = conn.cursor()
         cursor.execute(
             "SELECT id, epic_id, name, image_filename FROM games "
             "WHERE image_filename IS NOT NULL AND image_filename != ''"
         )
-        for row in cursor.fetchall():
-            img_path = os.path.join(Config.IMAGES_DIR, row['image_filename'])
-            if not is_valid_cached_image(img_path):
-                cursor.execute(
-                    "UPDATE games SET image_filename = NULL, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-                    (row['id'],)
-                )
-                if cursor.rowcount > 0:
-                    print(f"  Cleared orphaned image ref: {row['name']}")
+        images_prefix = os.path.join(Config.IMAGES_DIR, '')
+        orphaned = [
+            row for row in cursor.fetchall()
+            if not is_valid_cached_image(images_prefix + row['image_filename'], cached_sizes)
+        ]
+        if orphaned:
+            cursor.executemany(
+                "UPDATE games SET image_filename = NULL, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                [(row['id'],) for row in orphaned]
+            )
+            for row in orphaned:
+                print(f"  Cleared orphaned image ref: {row['name']}")
@@ -8,6 +8,7 @@ import traceback
 from datetime import datetime, timezone
 
 import requests
+from requests.adapters import HTTPAdapter
 
 import epic_config
 
@@ -23,15 +24,17 @@ from epic_client import (
     get_game_price,
     load_etag,
     load_previous_api_hash,
+    loads_json,
     parse_offer_iso_dates,
     sanitize_filename,
     save_api_hash,
     save_etag,
 )
+from file_utils import write_bytes_atomic
 from image_processor import (
     apply_successful_image_updates_to_db,
     clear_orphaned_game_image_filenames,
-    is_valid_cached_image,
+    make_cached_image_check,
     run_parallel_image_downloads,
 )
 
@@ -42,8 +45,9 @@ def write_scrape_run_summary(payload):
         os.makedirs(Config.OUTPUT_DIR, exist_ok=True)
         path = Config.SCRAPE_SUMMARY_FILE
         payload = {**payload, 'finished_at': datetime.now(timezone.utc).isoformat()}
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(payload, f, indent=2, default=str)
+        # Serialise first, then one write + rename so readers never see a partial file
+        body = json.dumps(payload, indent=2, default=str).encode('utf-8')
+        write_bytes_atomic(path, body)
     except OSError as e:
         print(f"Failed to write scrape summary: {e}")
 
@@ -97,7 +101,7 @@ def collect_upcoming_promo_image_filenames(games):
         if not upcoming_offers:
             continue
         for offer_group in upcoming_offers:
-            for offer in offer_group.get('promotionalOffers', []):
+            for offer in offer_group.get('promotionalOffers', ()):
                 if epic_free_discount_percentage(offer) != 0:
                     continue
                 _, end = parse_offer_iso_dates(offer, game_title)
@@ -110,60 +114,62 @@ def collect_upcoming_promo_image_filenames(games):
     return filenames
 
 
-def collect_retry_and_mystery_download_tasks(all_games, games):
+# Fields the download pipeline reads; mystery bookkeeping stays in mystery_updates
+_DOWNLOAD_TASK_KEYS = ('url', 'path', 'game', 'type')
+
+
+def collect_retry_and_mystery_download_tasks(all_games, games, image_valid=None):
     """Find games needing image downloads: missing images and mystery game reveals."""
     print("Checking for existing games missing images...")
-    existing_games_missing_images = {}
-    for g in all_games:
-        if not g.get('image_filename'):
-            existing_games_missing_images[g['epic_id']] = g
-        else:
-            img_path = os.path.join(Config.IMAGES_DIR, g['image_filename'])
-            if not is_valid_cached_image(img_path):
-                existing_games_missing_images[g['epic_id']] = g
-
-    mystery_games_to_update = [g for g in all_games
-                               if 'mystery' in g['name'].lower()]
-
+    if image_valid is None:
+        image_valid = make_cached_image_check()
     api_games_by_id = {game.get('id'): game for game in games if game.get('id')}
+    images_prefix = os.path.join(Config.IMAGES_DIR, '')
     retry_download_tasks = []
     mystery_update_tasks = []
 
-    for epic_id, db_game in existing_games_missing_images.items():
-        api_game = api_games_by_id.get(epic_id)
-        if api_game:
-            image_url = get_game_image_url(api_game)
-            if image_url:
-                image_filename = f"{sanitize_filename(epic_id)}.jpg"
-                image_path = os.path.join(Config.IMAGES_DIR, image_filename)
-                if not is_valid_cached_image(image_path):
-                    retry_download_tasks.append({
-                        'url': image_url, 'path': image_path,
-                        'game': db_game['name'], 'type': 'retry',
-                    })
-
-    for db_game in mystery_games_to_update:
+    # One pass over the DB rows; only games still in the API payload can be
+    # repaired, so the cache check is skipped for everything else
+    for db_game in all_games:
         epic_id = db_game['epic_id']
         api_game = api_games_by_id.get(epic_id)
-        if api_game:
+        if api_game is None:
+            continue
+        db_name = db_game['name']
+        stored_filename = db_game.get('image_filename')
+        image_filename = f"{sanitize_filename(epic_id)}.jpg"
+        image_path = images_prefix + image_filename
+        image_url = get_game_image_url(api_game)
+
+        if image_url:
+            path_valid = image_valid(image_path)
+            if stored_filename == image_filename:
+                stored_valid = path_valid
+            else:
+                stored_valid = bool(stored_filename) and image_valid(
+                    images_prefix + stored_filename
+                )
+            if not stored_valid and not path_valid:
+                retry_download_tasks.append({
+                    'url': image_url, 'path': image_path,
+                    'game': db_name, 'type': 'retry',
+                })
+
+        if 'mystery' in db_name.lower() and image_url:
             api_name = api_game.get('title', '')
-            db_name = db_game['name']
+            api_name_lower = api_name.lower()
             is_revealed = (
-                'mystery' not in api_name.lower()
-                and api_name.lower() != db_name.lower()
+                'mystery' not in api_name_lower
+                and api_name_lower != db_name.lower()
             )
-            image_url = get_game_image_url(api_game)
-            if image_url:
-                image_filename = f"{sanitize_filename(epic_id)}.jpg"
-                image_path = os.path.join(Config.IMAGES_DIR, image_filename)
-                mystery_update_tasks.append({
-                    'url': image_url, 'path': image_path,
-                    'epic_id': epic_id, 'old_name': db_name,
-                    'new_name': api_name if is_revealed else db_name,
-                    'update_name': is_revealed,
-                    'game': api_name if is_revealed else db_name,
-                    'type': 'mystery_update',
-                })
+            mystery_update_tasks.append({
+                'url': image_url, 'path': image_path,
+                'epic_id': epic_id, 'old_name': db_name,
+                'new_name': api_name if is_revealed else db_name,
+                'update_name': is_revealed,
+                'game': api_name if is_revealed else db_name,
+                'type': 'mystery_update',
+            })
 
     download_tasks = []
     mystery_updates = {}
@@ -172,27 +178,29 @@ def collect_retry_and_mystery_download_tasks(all_games, games):
         download_tasks.extend(retry_download_tasks)
     if mystery_update_tasks:
         print(f"Found {len(mystery_update_tasks)} mystery games to update")
-        download_tasks.extend([
-            {k: v for k, v in task.items() if k != 'update_name'}
+        download_tasks.extend(
+            {key: task[key] for key in _DOWNLOAD_TASK_KEYS}
             for task in mystery_update_tasks
-        ])
+        )
         mystery_updates = {task['epic_id']: task for task in mystery_update_tasks}
     return download_tasks, mystery_updates
 
 
 def cleanup_legacy_next_game_files(kept_basenames):
     """Remove legacy next-game*.jpg files no longer tied to upcoming promos."""
-    kept = set(kept_basenames)
-    for filename in os.listdir(Config.IMAGES_DIR):
-        if (filename.startswith("next-game")
-                and filename.endswith(".jpg")
-                and filename not in kept):
-            try:
-                filepath = os.path.join(Config.IMAGES_DIR, filename)
-                os.remove(filepath)
-                print(f"Removed unused file: {filename}")
-            except OSError as e:
-                print(f"Failed to remove {filename}: {e}")
+    kept = frozenset(kept_basenames)
+    with os.scandir(Config.IMAGES_DIR) as entries:
+        for entry in entries:
+            filename = entry.name
+            if (filename.startswith("next-game")
+                    and filename.endswith(".jpg")
+                    and filename not in kept
+                    and entry.is_file(follow_symlinks=False)):
+                try:
+                    os.remove(entry.path)
+                    print(f"Removed unused file: {filename}")
+                except OSError as e:
+                    print(f"Failed to remove {filename}: {e}")
 
 
 def scrape_epic_free_games():
@@ -207,6 +215,12 @@ def scrape_epic_free_games():
     next_games = []
 
     session = requests.Session()
+    # One pool shared by the API call and every download worker
+    session.mount('https://', HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=Config.MAX_DOWNLOAD_WORKERS * 2,
+        max_retries=0,
+    ))
     run_started = time.monotonic()
 
     try:
@@ -230,10 +244,15 @@ def scrape_epic_free_games():
             successful_downloads, failed_downloads = run_parallel_image_downloads(
                 maintenance_tasks, session
             )
-            apply_successful_image_updates_to_db(db, successful_downloads, mystery_updates)
-            clear_orphaned_game_image_filenames(db)
-            db.record_scrape_run(games_found=0, new_games=0, current=0, upcoming=0, success=True)
-            db.update_statistics_cache()
+            with db.get_connection() as conn:
+                apply_successful_image_updates_to_db(
+                    db, successful_downloads, mystery_updates, conn=conn
+                )
+                clear_orphaned_game_image_filenames(db, conn=conn)
+                db.record_scrape_run(
+                    games_found=0, new_games=0, current=0, upcoming=0, success=True, conn=conn
+                )
+                db.update_statistics_cache(conn=conn)
             write_scrape_run_summary({
                 'success': True, 'early_exit_etag': True,
                 'duration_seconds': round(time.monotonic() - run_started, 3),
@@ -250,7 +269,10 @@ def scrape_epic_free_games():
         if new_etag:
             save_etag(new_etag)
 
-        api_data = response.json()
+        current_hash = compute_api_hash(response.content)
+        previous_hash = load_previous_api_hash()
+
+        api_data = loads_json(response.content)
 
         try:
             games = api_data['data']['Catalog']['searchStore']['elements']
@@ -259,9 +281,6 @@ def scrape_epic_free_games():
         if not isinstance(games, list):
             raise ValueError("API did not return a list of games")
 
-        current_hash = compute_api_hash(api_data)
-        previous_hash = load_previous_api_hash()
-
         if current_hash == previous_hash and previous_hash is not None:
             print("API response unchanged — skipping full catalog update; running image maintenance")
             maintenance_tasks, mystery_updates = collect_retry_and_mystery_download_tasks(
@@ -270,15 +289,20 @@ def scrape_epic_free_games():
             successful_downloads, failed_downloads = run_parallel_image_downloads(
                 maintenance_tasks, session
             )
-            apply_successful_image_updates_to_db(db, successful_downloads, mystery_updates)
-            clear_orphaned_game_image_filenames(db)
+            with db.get_connection() as conn:
+                apply_successful_image_updates_to_db(
+                    db, successful_downloads, mystery_updates, conn=conn
+                )
+                clear_orphaned_game_image_filenames(db, conn=conn)
             cleanup_legacy_next_game_files(collect_upcoming_promo_image_filenames(games))
 
             save_api_hash(current_hash)
-            db.record_scrape_run(
-                games_found=len(games), new_games=0, current=0, upcoming=0, success=True
-            )
-            db.update_statistics_cache()
+            with db.get_connection() as conn:
+                db.record_scrape_run(
+                    games_found=len(games), new_games=0, current=0, upcoming=0, success=True,
+                    conn=conn,
+                )
+                db.update_statistics_cache(conn=conn)
             write_scrape_run_summary({
                 'success': True,
                 'early_exit_api_unchanged': True,
@@ -298,50 +322,57 @@ def scrape_epic_free_games():
         print("API response changed - processing updates...")
         now = datetime.now(timezone.utc)
 
-        games_to_insert = []
+        # Keyed so a game listed under several offers is inserted and downloaded once
+        games_to_insert = {}
         promotions_to_insert = []
-        download_tasks = []
+        download_tasks = {}
+
+        existing_next_game_images = set()
+        # One directory listing and one verdict per path for every cache check below
+        image_valid = make_cached_image_check()
+        # Paths are built by concatenation; os.path.join per game is pure overhead
+        images_prefix = os.path.join(Config.IMAGES_DIR, '')
 
-        # First pass: upcoming games to capture prices before they become free
+        # Single pass: each game's upcoming offers (to capture prices before they
+        # become free) and current offers share the per-game lookups below
         for game in games:
-            if not game.get('promotions'):
+            promotions = game.get('promotions')
+            if not promotions:
                 continue
             game_title = game['title']
             game_link = get_game_link(game)
             if not game_link:
                 print(f"Skipping {game_title}: no valid link found")
                 continue
-
-            upcoming_offers = game['promotions'].get('upcomingPromotionalOffers', [])
-            if upcoming_offers and len(upcoming_offers) > 0:
-                for offer_group in upcoming_offers:
-                    for offer in offer_group.get('promotionalOffers', []):
-                        if epic_free_discount_percentage(offer) != 0:
-                            continue
-                        _, _end = parse_offer_iso_dates(offer, game_title)
-                        if _end is None:
-                            continue
-                        image_url = get_game_image_url(game)
-                        availability = (
-                            f"{format_date(offer['startDate'])} - "
-                            f"{format_date(offer['endDate'])}"
-                        )
+            image_url = get_game_image_url(game)
+            game_id = sanitize_filename(game.get('id', game_link.split('/')[-1]))
+            image_filename = f"{game_id}.jpg"
+            image_path = images_prefix + image_filename
+            # Row fields (price, metadata) are built once per game, on first free offer
+            game_key = (game_id, 'PC')
+
+            for offer_group in promotions.get('upcomingPromotionalOffers') or []:
+                for offer in offer_group.get('promotionalOffers', ()):
+                    if epic_free_discount_percentage(offer) != 0:
+                        continue
+                    _, _end = parse_offer_iso_dates(offer, game_title)
+                    if _end is None:
+                        continue
+                    availability = (
+                        f"{format_date(offer['startDate'])} - "
+                        f"{format_date(offer['endDate'])}"
+                    )
+                    if (image_url and image_path not in download_tasks
+                            and not image_valid(image_path)):
+                        download_tasks[image_path] = {
+                            'url': image_url, 'path': image_path,
+                            'game': game_title, 'type': 'upcoming',
+                        }
+
+                    if game_key not in games_to_insert:
                         original_price_cents, discount_price_cents, currency_code = get_game_price(game)
-                        upcoming_game_id = sanitize_filename(
-                            game.get('id', game_link.split('/')[-1])
-                        )
-                        image_filename = f"{upcoming_game_id}.jpg"
-                        image_path = os.path.join(Config.IMAGES_DIR, image_filename)
-
-                        if image_url and not is_valid_cached_image(image_path):
-                            download_tasks.append({
-                                'url': image_url, 'path': image_path,
-                                'game': game_title, 'type': 'upcoming',
-                            })
-
-                        meta = extract_game_metadata(game)
-                        games_to_insert.append({
-                            'epic_id': upcoming_game_id,
+                        games_to_insert[game_key] = {
+                            'epic_id': game_id,
                             'name': game_title,
                             'link': game_link,
                             'platform': 'PC',
@@ -349,126 +380,128 @@ def scrape_epic_free_games():
                             'original_price_cents': original_price_cents,
                             'discount_price_cents': discount_price_cents,
                             'currency_code': currency_code,
-                            **meta,
-                        })
-                        promotions_to_insert.append({
-                            'epic_id': upcoming_game_id, 'platform': 'PC',
-                            'start_date': offer['startDate'],
-                            'end_date': offer['endDate'],
-                            'status': 'upcoming',
-                        })
-                        next_games.append({
-                            'Name': game_title, 'Link': game_link,
-                            'Image': image_path, 'Availability': availability,
-                        })
-
-        # Second pass: currently free games
-        for game in games:
-            if not game.get('promotions'):
-                continue
-            game_title = game['title']
-            game_link = get_game_link(game)
-            if not game_link:
-                continue
+                            **extract_game_metadata(game),
+                        }
+                    promotions_to_insert.append({
+                        'epic_id': game_id, 'platform': 'PC',
+                        'start_date': offer['startDate'],
+                        'end_date': offer['endDate'],
+                        'status': 'upcoming',
+                    })
+                    existing_next_game_images.add(image_filename)
+                    next_games.append({
+                        'Name': game_title, 'Link': game_link,
+                        'Image': image_path, 'Availability': availability,
+                    })
 
-            promo_offers = game['promotions'].get('promotionalOffers', [])
-            if promo_offers and len(promo_offers) > 0:
-                for offer_group in promo_offers:
-                    for offer in offer_group.get('promotionalOffers', []):
-                        start, end = parse_offer_iso_dates(offer, game_title)
-                        if start is None:
-                            continue
-                        if not (start <= now <= end and epic_free_discount_percentage(offer) == 0):
-                            continue
-                        image_url = get_game_image_url(game)
-                        game_id = sanitize_filename(game.get('id', game_link.split('/')[-1]))
-                        date_period = f"Free Now - {format_date(offer['endDate'])}"
+            for offer_group in promotions.get('promotionalOffers') or []:
+                for offer in offer_group.get('promotionalOffers', ()):
+                    # Discount lookup first: paid offers never reach date parsing
+                    if epic_free_discount_percentage(offer) != 0:
+                        continue
+                    start, end = parse_offer_iso_dates(offer, game_title)
+                    if start is None or not start <= now <= end:
+                        continue
+                    date_period = f"Free Now - {format_date(offer['endDate'])}"
+
+                    current_image_filename = None
+                    current_image_path = None
+                    if image_url:
+                        current_image_filename = image_filename
+                        current_image_path = image_path
+                        if (image_path not in download_tasks
+                                and not image_valid(image_path)):
+                            download_tasks[image_path] = {
+                                'url': image_url, 'path': image_path,
+                                'game': game_title, 'type': 'current',
+                            }
 
+                    if game_key not in games_to_insert:
                         original_price_cents, discount_price_cents, currency_code = get_game_price(game)
                         if original_price_cents == 0:
                             original_price_cents = None
                             discount_price_cents = None
                             currency_code = None
-
-                        image_filename = None
-                        image_path = None
-                        if image_url:
-                            image_filename = f"{game_id}.jpg"
-                            image_path = os.path.join(Config.IMAGES_DIR, image_filename)
-                            if not is_valid_cached_image(image_path):
-                                download_tasks.append({
-                                    'url': image_url, 'path': image_path,
-                                    'game': game_title, 'type': 'current',
-                                })
-
-                        meta = extract_game_metadata(game)
-                        games_to_insert.append({
+                        games_to_insert[game_key] = {
                             'epic_id': game_id,
                             'name': game_title,
                             'link': game_link,
                             'platform': 'PC',
-                            'image_filename': image_filename,
+                            'image_filename': current_image_filename,
                             'original_price_cents': original_price_cents,
                             'discount_price_cents': discount_price_cents,
                             'currency_code': currency_code,
-                            **meta,
-                        })
-                        promotions_to_insert.append({
-                            'epic_id': game_id, 'platform': 'PC',
-                            'start_date': offer['startDate'],
-                            'end_date': offer['endDate'],
-                            'status': 'current',
-                        })
-
-                        if game_link not in existing_games_dict:
-                            new_games.append(game_title)
-
-                        current_games.append({
-                            'Name': game_title, 'Link': game_link,
-                            'Image': image_path, 'Availability': date_period,
-                        })
-
-        existing_next_game_images = collect_upcoming_promo_image_filenames(games)
-        extra_tasks, mystery_updates = collect_retry_and_mystery_download_tasks(all_games, games)
-        download_tasks.extend(extra_tasks)
+                            **extract_game_metadata(game),
+                        }
+                    promotions_to_insert.append({
+                        'epic_id': game_id, 'platform': 'PC',
+                        'start_date': offer['startDate'],
+                        'end_date': offer['endDate'],
+                        'status': 'current',
+                    })
+
+                    if game_link not in existing_games_dict:
+                        new_games.append(game_title)
+
+                    current_games.append({
+                        'Name': game_title, 'Link': game_link,
+                        'Image': current_image_path, 'Availability': date_period,
+                    })
+
+        extra_tasks, mystery_updates = collect_retry_and_mystery_download_tasks(
+            all_games, games, image_valid
+        )
+        # Only retry/mystery images need a follow-up UPDATE; new rows already carry theirs
+        retry_paths = {task['path'] for task in extra_tasks}
+        for task in extra_tasks:
+            download_tasks.setdefault(task['path'], task)
         successful_downloads, failed_downloads = run_parallel_image_downloads(
-            download_tasks, session
+            list(download_tasks.values()), session
         )
 
+        games_to_insert = list(games_to_insert.values())
         # Only set image_filename if the file actually exists
         for game_data in games_to_insert:
             if game_data.get('image_filename'):
-                image_path = os.path.join(Config.IMAGES_DIR, game_data['image_filename'])
-                file_exists = is_valid_cached_image(image_path) or image_path in successful_downloads
+                image_path = images_prefix + game_data['image_filename']
+                # Fresh downloads are not in the pre-run scan; check them first
+                file_exists = image_path in successful_downloads or image_valid(image_path)
                 if not file_exists:
                     game_data['image_filename'] = None
 
-        print(f"Batch inserting {len(games_to_insert)} games...")
-        game_id_map = db.batch_insert_or_update_games(games_to_insert)
+        # Games, promotions, image updates and orphan cleanup commit as one transaction
+        with db.get_connection() as conn:
+            print(f"Batch inserting {len(games_to_insert)} games...")
+            game_id_map = db.batch_insert_or_update_games(games_to_insert, conn=conn)
 
-        for promo in promotions_to_insert:
-            epic_id = promo.pop('epic_id')
-            platform = promo['platform']
-            promo['game_id'] = game_id_map.get((epic_id, platform))
-            if not promo['game_id']:
-                print(f"Warning: Could not find game_id for {epic_id}")
+            for promo in promotions_to_insert:
+                epic_id = promo.pop('epic_id')
+                platform = promo['platform']
+                promo['game_id'] = game_id_map.get((epic_id, platform))
+                if not promo['game_id']:
+                    print(f"Warning: Could not find game_id for {epic_id}")
 
-        print(f"Batch inserting {len(promotions_to_insert)} promotions...")
-        db.batch_insert_promotions(promotions_to_insert)
+            print(f"Batch inserting {len(promotions_to_insert)} promotions...")
+            db.batch_insert_promotions(promotions_to_insert, conn=conn)
 
-        apply_successful_image_updates_to_db(db, successful_downloads, mystery_updates)
-        clear_orphaned_game_image_filenames(db)
+            apply_successful_image_updates_to_db(
+                db, successful_downloads & retry_paths, mystery_updates, conn=conn
+            )
+            clear_orphaned_game_image_filenames(db, conn=conn)
         cleanup_legacy_next_game_files(existing_next_game_images)
 
         print(f"Data scraped successfully. Found {len(new_games)} new games.")
-        send_discord_notification(len(games), new_games, current_games, next_games)
+        send_discord_notification(len(games), new_games, current_games, next_games, session)
         save_api_hash(current_hash)
 
-        db.record_scrape_run(
-            games_found=len(games), new_games=len(new_games),
-            current=len(current_games), upcoming=len(next_games), success=True,
-        )
-        db.update_statistics_cache()
+        # Recorded only once the hash is saved, so a late failure logs just the error run
+        with db.get_connection() as conn:
+            db.record_scrape_run(
+                games_found=len(games), new_games=len(new_games),
+                current=len(current_games), upcoming=len(next_games), success=True,
+                conn=conn,
+            )
+            db.update_statistics_cache(conn=conn)
 
         write_scrape_run_summary({
             'success': True,
@@ -508,15 +541,18 @@ def scrape_epic_free_games():
         session.close()
 
 
-def send_discord_notification(games_checked, new_games, current_games, upcoming_games):
-    """Send a Discord webhook notification with scrape results (if configured)."""
+def send_discord_notification(games_checked, new_games, current_games, upcoming_games, session=None):
+    """Send a Discord webhook notification with scrape results (if configured).
+
+    Pass the scraper's ``session`` to reuse its pooled adapter instead of the
+    throwaway Session a bare requests.post builds.
+    """
     webhook_url = os.environ.get('DISCORD_WEBHOOK_URL', '').strip()
     if not webhook_url:
         return
     if not new_games and not current_games:
         return
     try:
-        import requests as req
         fields = []
         if new_games:
             fields.append({'name': 'New Games', 'value': '\n'.join('• ' + n for n in new_games[:10]), 'inline': False})
@@ -531,7 +567,7 @@ def send_discord_notification(games_checked, new_games, current_games, upcoming_
             'fields': fields,
             'timestamp': datetime.now(timezone.utc).isoformat(),
         }
-        req.post(webhook_url, json={'embeds': [embed]}, timeout=10)
+        (session or requests).post(webhook_url, json={'embeds': [embed]}, timeout=10)
     except Exception as e:
         print(f"Discord webhook failed: {e}")
 
@@ -83,21 +83,22 @@ def main() -> int:
         print(f"Network error fetching API: {e.reason}", file=sys.stderr)
         return 1
 
-    try:
-        data = json.loads(raw.decode())
-    except json.JSONDecodeError as e:
-        print(f"Invalid JSON from API: {e}", file=sys.stderr)
-        return 1
-
-    current = hashlib.sha256(
-        json.dumps(data, sort_keys=True).encode()
-    ).hexdigest()
+    # Must match epic_client.compute_api_hash: SHA256 of the raw body bytes,
+    # hashed in one update call over the whole buffer
+    current = hashlib.sha256(raw, usedforsecurity=False).hexdigest()
     prev = ""
     if os.path.isfile(hash_file):
         with open(hash_file, encoding="utf-8") as f:
             prev = f.read().strip()
 
     unchanged = bool(prev and current == prev)
+    if not unchanged:
+        # A matching hash means the scraper already parsed this exact body
+        try:
+            json.loads(raw)
+        except json.JSONDecodeError as e:
+            print(f"Invalid JSON from API: {e}", file=sys.stderr)
+            return 1
     print(
         "✓ API unchanged - skipping scrape"
         if unchanged
@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+import ipaddress
 import json
+import socket
 from pathlib import Path
 
+import epic_client
 import epic_config
 from epic_client import (
+    Config,
+    _is_blocked_ip,
     compute_api_hash,
     epic_free_discount_percentage,
     extract_game_metadata,
@@ -14,11 +19,13 @@ from epic_client import (
     get_game_image_url,
     get_game_link,
     get_game_price,
+    loads_json,
     parse_offer_iso_dates,
     resolve_tag_names,
     sanitize_filename,
     validate_url,
 )
+from file_utils import dumps_json
 
 FIXTURE = Path(__file__).resolve().parent / "fixtures" / "free_games_promotions_sample.json"
 
@@ -42,11 +49,12 @@ def test_catalog_elements_path():
 
 
 def test_api_hash_deterministic():
-    data = _load_fixture()
-    a = compute_api_hash(data)
-    b = compute_api_hash(data)
+    raw = FIXTURE.read_bytes()
+    a = compute_api_hash(raw)
+    b = compute_api_hash(raw)
     assert a == b
     assert len(a) == 64
+    assert compute_api_hash(raw + b" ") != a
 
 
 def test_get_game_link_locale_matches_config():
@@ -70,6 +78,10 @@ def test_promotional_offer_fields():
 def test_malformed_offer_safe():
     assert epic_free_discount_percentage({}) is None
     assert epic_free_discount_percentage({"discountSetting": {}}) is None
+    assert epic_free_discount_percentage({"discountSetting": None}) is None
+    assert epic_free_discount_percentage({"discountSetting": "0"}) is None
+    assert epic_free_discount_percentage(None) is None
+    assert epic_free_discount_percentage({"discountSetting": {"discountPercentage": "0"}}) == 0
     assert parse_offer_iso_dates({}, "x") == (None, None)
 
 
@@ -80,6 +92,8 @@ def test_sanitize_filename():
     assert sanitize_filename("test\x00null") == "test_null"
     assert sanitize_filename(".hidden") == "hidden"
     assert sanitize_filename("a" * 250) == "a" * 200
+    assert sanitize_filename("_") == "unknown"
+    assert sanitize_filename(" spaced") == "spaced"
 
 
 def test_resolve_tag_names():
@@ -94,6 +108,13 @@ def test_get_game_image_url():
     assert get_game_image_url(game) == "wide.jpg"
     assert get_game_image_url({}) is None
     assert get_game_image_url({"keyImages": []}) is None
+    dupes = {"keyImages": [
+        {"type": "OfferImageTall", "url": "tall-1.jpg"},
+        {"type": "OfferImageTall", "url": "tall-2.jpg"},
+        {"type": "featuredMedia", "url": "media.jpg"},
+    ]}
+    assert get_game_image_url(dupes) == "tall-1.jpg"
+    assert get_game_image_url({"keyImages": [{"type": "Other", "url": "x.jpg"}]}) == "x.jpg"
 
 
 def test_get_game_price():
@@ -107,6 +128,9 @@ def test_get_game_price():
 def test_format_date():
     result = format_date("2026-08-15T16:00:00Z")
     assert "Aug 15" in result or "15 Aug" in result
+    assert format_date("2026-08-15T16:00:00Z") is result
+    assert format_date("") == ""
+    assert format_date(None) == ""
 
 
 def test_extract_game_metadata():
@@ -124,3 +148,48 @@ def test_validate_url():
     assert not validate_url("http://example.com")
     assert not validate_url("ftp://example.com/file")
     assert validate_url("https://example.com/image.jpg")
+
+
+def test_validate_url_caches_dns(monkeypatch):
+    calls = []
+
+    def fake_getaddrinfo(host, port, type=0):
+        calls.append(host)
+        addr = "10.0.0.5" if host == "internal.test" else "93.184.216.34"
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (addr, 0))]
+
+    epic_client._resolve_host.cache_clear()
+    epic_client._validate_host.cache_clear()
+    monkeypatch.setattr(epic_client.socket, "getaddrinfo", fake_getaddrinfo)
+    epic_client.prewarm_dns(["https://cdn.test/a.jpg", "https://cdn.test/b.jpg", "not a url"])
+    assert validate_url("https://cdn.test/c.jpg")
+    assert not validate_url("https://internal.test/x.jpg")
+    assert not validate_url("https://internal.test/y.jpg")
+    assert calls == ["cdn.test", "internal.test"]
+    assert epic_client._validate_host.cache_info().hits == 1
+    epic_client._resolve_host.cache_clear()
+    epic_client._validate_host.cache_clear()
+
+
+def test_loads_json_matches_stdlib():
+    raw = FIXTURE.read_bytes()
+    assert loads_json(raw) == json.loads(raw)
+
+
+def test_dumps_json_matches_stdlib_layout():
+    data = json.loads(FIXTURE.read_bytes())
+    expected = json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    assert dumps_json(data) == expected
+
+
+def test_is_blocked_ip_matches_networks():
+    samples = [
+        "10.0.0.0", "10.255.255.255", "11.0.0.0", "9.255.255.255",
+        "172.15.255.255", "172.16.0.1", "172.31.255.255", "172.32.0.0",
+        "192.168.1.1", "127.0.0.1", "169.254.1.1", "93.184.216.34",
+        "::1", "::2", "fc00::1", "fdff::1", "fe80::1", "febf::1", "fec0::1", "2606:4700::1",
+    ]
+    for s in samples:
+        ip = ipaddress.ip_address(s)
+        expected = any(ip in net for net in Config.BLOCKED_IP_RANGES)
+        assert _is_blocked_ip(ip) == expected, s
@@ -0,0 +1,260 @@
+"""Image cache validation and conversion tests (local files, no network)."""
+
+from __future__ import annotations
+
+import hashlib
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+import image_processor
+from db_manager import DatabaseManager
+from epic_client import Config
+from image_processor import (
+    _convert_and_save_image,
+    _flatten_to_rgb,
+    _jpeg_dimensions,
+    apply_successful_image_updates_to_db,
+    clear_orphaned_game_image_filenames,
+    is_valid_cached_image,
+    scan_image_cache,
+)
+
+
+def _write_jpeg(path, size, **save_kwargs):
+    # Noise keeps the encoded file above the 1KB cache-validity floor
+    img = Image.effect_noise(size, 64).convert("RGB")
+    img.save(path, "JPEG", quality=85, **save_kwargs)
+    return path
+
+
+def test_jpeg_dimensions_baseline(tmp_path):
+    path = _write_jpeg(tmp_path / "a.jpg", (320, 180))
+    assert _jpeg_dimensions(path.read_bytes()) == (320, 180)
+
+
+def test_jpeg_dimensions_progressive(tmp_path):
+    path = _write_jpeg(tmp_path / "p.jpg", (200, 120), progressive=True)
+    assert _jpeg_dimensions(path.read_bytes()) == (200, 120)
+
+
+def test_jpeg_dimensions_rejects_non_jpeg(tmp_path):
+    png = tmp_path / "a.png"
+    Image.new("RGB", (64, 64)).save(png, "PNG")
+    assert _jpeg_dimensions(png.read_bytes()) is None
+    assert _jpeg_dimensions(b"") is None
+    assert _jpeg_dimensions(b"\xff\xd8\xff\xe0\x00") is None
+
+
+def test_is_valid_cached_image(tmp_path):
+    assert is_valid_cached_image(_write_jpeg(tmp_path / "ok.jpg", (320, 180)))
+    assert not is_valid_cached_image(_write_jpeg(tmp_path / "tiny.jpg", (40, 40)))
+    assert not is_valid_cached_image(tmp_path / "missing.jpg")
+    png = tmp_path / "noise.png"
+    Image.effect_noise((128, 128), 64).convert("RGB").save(png, "PNG")
+    assert not is_valid_cached_image(png)
+
+
+def test_is_valid_cached_image_rejects_oversize_header(tmp_path, monkeypatch):
+    path = _write_jpeg(tmp_path / "big.jpg", (320, 180))
+    monkeypatch.setattr(image_processor.Config, "MAX_IMAGE_DIMENSION", 300)
+    assert not is_valid_cached_image(path)
+
+
+def test_convert_downscales_large_rgba_png(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_processor, "KNOWN_PLACEHOLDER_MD5S", {})
+    monkeypatch.setattr(Config, "MAX_OUTPUT_DIMENSION", 100)
+    buf = BytesIO()
+    Image.new("RGBA", (400, 200), (0, 0, 255, 0)).save(buf, "PNG")
+    out = tmp_path / "out.jpg"
+    _convert_and_save_image(buf.getvalue(), str(out))
+    with Image.open(out) as img:
+        assert img.size == (100, 50)
+        assert img.getpixel((50, 25)) == (255, 255, 255)
+
+
+class _FakeResponse:
+    def __init__(self, url, body):
+        self.url = url
+        self.headers = {"Content-Length": str(len(body))}
+        self._body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self._body), chunk_size):
+            yield self._body[i:i + chunk_size]
+
+
+class _FakeSession:
+    def __init__(self, body):
+        self.body = body
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        return _FakeResponse(url, self.body)
+
+
+def _register_placeholder(monkeypatch, img):
+    """Add img's full-size baseline fingerprint to the known placeholders."""
+    buf = BytesIO()
+    img.save(buf, "JPEG", quality=85, optimize=True)
+    monkeypatch.setattr(
+        image_processor, "KNOWN_PLACEHOLDER_MD5S",
+        {hashlib.md5(buf.getvalue()).hexdigest(): img.size},
+    )
+
+
+def test_download_rejects_placeholder_regardless_of_encoder(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_processor, "validate_url", lambda url: True)
+    monkeypatch.setattr(image_processor.Config, "IMAGE_PROGRESSIVE", True)
+    placeholder = Image.effect_noise((120, 80), 64).convert("RGB")
+    _register_placeholder(monkeypatch, placeholder)
+    buf = BytesIO()
+    placeholder.save(buf, "PNG")
+    out = tmp_path / "out.jpg"
+    with pytest.raises(ValueError, match="placeholder"):
+        image_processor.download_and_convert_image(
+            "https://cdn.test/p.png", str(out), session=_FakeSession(buf.getvalue())
+        )
+    assert not out.exists()
+
+
+def test_placeholder_fingerprint_skips_other_sizes(monkeypatch):
+    calls = []
+    monkeypatch.setattr(image_processor, "KNOWN_PLACEHOLDER_MD5S", {"0" * 32: (640, 360)})
+    monkeypatch.setattr(image_processor, "_is_placeholder_bytes", calls.append)
+    assert not image_processor._is_placeholder_rgb(Image.new("RGB", (320, 180)))
+    assert calls == []
+
+
+def test_download_rejects_oversized_placeholder_before_downscale(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_processor, "validate_url", lambda url: True)
+    buf = BytesIO()
+    Image.effect_noise((2560, 1440), 64).convert("RGB").save(buf, "JPEG", quality=90)
+    with Image.open(BytesIO(buf.getvalue())) as decoded:
+        _register_placeholder(monkeypatch, decoded)
+    out = tmp_path / "out.jpg"
+    with pytest.raises(ValueError, match="placeholder"):
+        image_processor.download_and_convert_image(
+            "https://cdn.test/p.jpg", str(out), session=_FakeSession(buf.getvalue())
+        )
+    assert not out.exists()
+
+
+def test_flatten_to_rgb_composites_la_and_palette():
+    la = Image.new("LA", (8, 8), (0, 0))
+    assert _flatten_to_rgb(la).getpixel((0, 0)) == (255, 255, 255)
+    half = _flatten_to_rgb(Image.new("RGBA", (8, 8), (0, 0, 0, 128))).getpixel((0, 0))
+    assert all(126 <= c <= 128 for c in half)
+    opaque = Image.new("P", (8, 8), 3)
+    assert _flatten_to_rgb(opaque).mode == "RGB"
+
+
+def test_convert_downscales_large_jpeg(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "MAX_OUTPUT_DIMENSION", 200)
+    buf = BytesIO()
+    Image.effect_noise((900, 450), 64).convert("RGB").save(buf, "JPEG", quality=70)
+    out = tmp_path / "out.jpg"
+    _convert_and_save_image(buf.getvalue(), str(out))
+    with Image.open(out) as img:
+        assert img.size == (200, 100)
+
+
+def test_convert_downscales_extreme_aspect_jpeg(tmp_path, monkeypatch):
+    # No known placeholder at this size: thumbnail() drafts the unloaded JPEG
+    monkeypatch.setattr(image_processor, "KNOWN_PLACEHOLDER_MD5S", {})
+    buf = BytesIO()
+    Image.effect_noise((9000, 4), 64).convert("RGB").save(buf, "JPEG", quality=70)
+    out = tmp_path / "out.jpg"
+    _convert_and_save_image(buf.getvalue(), str(out))
+    with Image.open(out) as img:
+        assert img.width == 1920
+        assert img.height >= 1
+
+
+def test_is_valid_cached_image_uses_scanned_sizes(tmp_path):
+    ok = _write_jpeg(tmp_path / "ok.jpg", (320, 180))
+    (tmp_path / "sub").mkdir()
+    sizes = scan_image_cache(str(tmp_path))
+    assert set(sizes) == {"ok.jpg"}
+    assert is_valid_cached_image(ok, sizes)
+    assert not is_valid_cached_image(tmp_path / "other.jpg", sizes)
+    assert not is_valid_cached_image(ok, {})
+
+
+def test_apply_image_updates_reports_only_changed_reveals(tmp_path, capsys):
+    db = DatabaseManager(str(tmp_path / "games.db"))
+    db.batch_insert_or_update_games([
+        {"epic_id": "b", "name": "Mystery", "link": "lb", "platform": "PC"},
+    ])
+    capsys.readouterr()
+    apply_successful_image_updates_to_db(
+        db,
+        {str(tmp_path / "b.jpg"), str(tmp_path / "gone.jpg")},
+        {
+            "b": {"update_name": True, "new_name": "Real B", "old_name": "Mystery"},
+            "gone": {"update_name": True, "new_name": "Real G", "old_name": "Mystery G"},
+        },
+    )
+    out = capsys.readouterr().out
+    assert "Revealed: Mystery -> Real B" in out
+    assert "Real G" not in out
+    assert "Revealed and updated 1 mystery games" in out
+
+
+def test_make_cached_image_check_memoizes(tmp_path, monkeypatch):
+    ok = str(_write_jpeg(tmp_path / "ok.jpg", (320, 180)))
+    calls = []
+    real = image_processor.is_valid_cached_image
+    monkeypatch.setattr(
+        image_processor, "is_valid_cached_image",
+        lambda path, sizes=None: calls.append(path) or real(path, sizes),
+    )
+    check = image_processor.make_cached_image_check(str(tmp_path))
+    assert check(ok) and check(ok)
+    assert not check(str(tmp_path / "missing.jpg"))
+    assert calls == [ok, str(tmp_path / "missing.jpg")]
+
+
+def test_parallel_downloads_fetch_shared_url_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_processor, "validate_url", lambda url: True)
+    monkeypatch.setattr(image_processor, "prewarm_dns", lambda urls: None)
+    buf = BytesIO()
+    Image.effect_noise((320, 180), 64).convert("RGB").save(buf, "JPEG", quality=70)
+    session = _FakeSession(buf.getvalue())
+    a, b = str(tmp_path / "a.jpg"), str(tmp_path / "b.jpg")
+    tasks = [
+        {"url": "https://cdn.test/x.jpg", "path": a, "game": "A"},
+        {"url": "https://cdn.test/x.jpg", "path": b, "game": "B"},
+        {"url": "https://cdn.test/x.jpg", "path": a, "game": "A again"},
+    ]
+    ok, failed = image_processor.run_parallel_image_downloads(tasks, session)
+    assert session.urls == ["https://cdn.test/x.jpg"]
+    assert ok == {a, b} and failed == []
+    assert (tmp_path / "b.jpg").read_bytes() == (tmp_path / "a.jpg").read_bytes()
+    assert (tmp_path / "b.webp").exists()
+
+
+def test_clear_orphaned_image_refs(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "IMAGES_DIR", str(tmp_path))
+    _write_jpeg(tmp_path / "ok.jpg", (320, 180))
+    db = DatabaseManager(str(tmp_path / "games.db"))
+    with db.connection() as conn:
+        conn.executemany(
+            "INSERT INTO games (epic_id, name, link, platform, image_filename) VALUES (?, ?, ?, 'PC', ?)",
+            [("ok", "Ok", "l1", "ok.jpg"), ("gone", "Gone", "l2", "gone.jpg")],
+        )
+    clear_orphaned_game_image_filenames(db)
+    with db.connection() as conn:
+        rows = dict(conn.execute("SELECT epic_id, image_filename FROM games").fetchall())
+    assert rows == {"ok": "ok.jpg", "gone": None}